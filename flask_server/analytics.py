@@ -0,0 +1,138 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Dealer analytics computed column-wise with pandas: the inventory and reports are loaded once into
+# DataFrames and every figure below comes from vectorized operations over those columns.
+
+# Fields read from MongoDB (everything else in the documents is ignored)
+VEHICLE_FIELDS = ["vin", "make", "model", "purchase_price", "sale_price", "sale_status", "date_added_at", "date_sold_at"]
+REPORT_FIELDS = ["vin", "cost", "date_occurred_at"]
+
+RECON_PERCENTILES = [25, 50, 75, 90, 99]
+AGING_BUCKETS = [0, 30, 60, 90, np.inf]
+AGING_LABELS = ["0-30", "31-60", "61-90", "90+"]
+TRAILING_MONTHS = 12
+
+# Helper to build a DataFrame with the given columns from a list of documents (missing fields become None);
+# dates are converted by the caller, which is much cheaper than letting pandas infer them per column
+def to_frame(documents, columns):
+    return pd.DataFrame({column: pd.Series([document.get(column) for document in documents], dtype=object)
+                         for column in columns})
+
+# Helper to turn a money column that may hold numbers or strings into floats (unparseable -> 0);
+# only values that don't parse as plain numbers go through the slower "$1,234.56" cleanup
+def money(column):
+    values = pd.to_numeric(column, errors="coerce")
+    formatted = values.isna() & column.notna()
+    if formatted.any():
+        values[formatted] = pd.to_numeric(column[formatted].astype(str).str.replace(r"[$,]", "", regex=True), errors="coerce")
+    return values.fillna(0.0).astype(float)
+
+# Helper to round a float Series/DataFrame for the response
+def rounded(values):
+    return values.round(2)
+
+# Helper to summarize a days column (count, mean, median, p90)
+def day_stats(days):
+    days = days.dropna()
+    if days.empty:
+        return {"count": 0, "mean": 0, "median": 0, "p90": 0}
+    return {
+        "count": int(days.size),
+        "mean": round(float(days.mean()), 1),
+        "median": round(float(days.median()), 1),
+        "p90": round(float(days.quantile(0.9)), 1)
+    }
+
+# Helper to turn a value from a DataFrame into a plain Python value (NaN, e.g. the mean of an all-missing
+# column, becomes None since NaN isn't valid JSON)
+def plain(value):
+    value = value.item() if isinstance(value, np.generic) else value
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+# Helper to turn a grouped DataFrame into a list of records with plain Python values
+def records(frame):
+    return [{key: plain(value) for key, value in row.items()} for row in frame.to_dict("records")]
+
+def compute_analytics(vehicles, reports, today=None, top=50):
+    today = pd.Timestamp(today or datetime.now())
+    inventory = to_frame(vehicles, VEHICLE_FIELDS)
+    report_frame = to_frame(reports, REPORT_FIELDS)
+
+    # Reconditioning per vehicle straight from the reports, so vehicles without rollups are covered too
+    report_frame["cost"] = money(report_frame["cost"])
+    report_frame["date_occurred_at"] = pd.to_datetime(report_frame["date_occurred_at"], errors="coerce")
+    recon_by_vin = report_frame.groupby("vin")["cost"].sum()
+
+    inventory["purchase_price"] = money(inventory["purchase_price"])
+    inventory["sale_price"] = money(inventory["sale_price"])
+    inventory["recon"] = inventory["vin"].map(recon_by_vin).fillna(0.0)
+    inventory["make"] = inventory["make"].fillna("Unknown").astype(str)
+    inventory["model"] = inventory["model"].fillna("Unknown").astype(str)
+    added = pd.to_datetime(inventory["date_added_at"], errors="coerce")
+    sold_at = pd.to_datetime(inventory["date_sold_at"], errors="coerce")
+    is_sold = (inventory["sale_status"] == "sold").to_numpy()
+
+    # Days in stock: until the sale for sold vehicles, until today for the rest
+    inventory["days_in_stock"] = (sold_at.where(is_sold, today) - added).dt.days
+    inventory["profit"] = np.where(is_sold, inventory["sale_price"] - inventory["purchase_price"] - inventory["recon"], np.nan)
+    inventory["sold_month"] = sold_at.dt.to_period("M").where(is_sold)
+
+    sold = inventory[is_sold]
+    unsold = inventory[~is_sold]
+
+    by_model = sold.groupby(["make", "model"]).agg(
+        units_sold=("profit", "size"),
+        total_profit=("profit", "sum"),
+        average_profit=("profit", "mean"),
+        average_days_in_stock=("days_in_stock", "mean")
+    ).sort_values("total_profit", ascending=False).head(top).reset_index()
+    by_model[["total_profit", "average_profit", "average_days_in_stock"]] = rounded(
+        by_model[["total_profit", "average_profit", "average_days_in_stock"]]
+    )
+
+    by_month = sold.dropna(subset=["sold_month"]).groupby("sold_month").agg(
+        units_sold=("profit", "size"),
+        revenue=("sale_price", "sum"),
+        profit=("profit", "sum")
+    )
+
+    # Trailing twelve months including the current one, with empty months filled with zeros
+    current_month = today.to_period("M")
+    months = pd.period_range(current_month - (TRAILING_MONTHS - 1), current_month, freq="M")
+    trailing = by_month.reindex(months, fill_value=0)
+    trailing["recon_spend"] = report_frame.groupby(report_frame["date_occurred_at"].dt.to_period("M"))["cost"].sum().reindex(months, fill_value=0)
+    trailing["vehicles_added"] = added.dt.to_period("M").value_counts().reindex(months, fill_value=0)
+    trailing[["revenue", "profit", "recon_spend"]] = rounded(trailing[["revenue", "profit", "recon_spend"]].astype(float))
+    trailing = trailing.rename_axis("month").reset_index()
+    trailing["month"] = trailing["month"].astype(str)
+
+    by_month = rounded(by_month.astype({"revenue": float, "profit": float})).rename_axis("month").reset_index()
+    by_month["month"] = by_month["month"].astype(str)
+
+    recon = inventory["recon"].to_numpy()
+    recon_percentiles = np.percentile(recon, RECON_PERCENTILES) if recon.size else np.zeros(len(RECON_PERCENTILES))
+    aging = pd.cut(unsold["days_in_stock"], AGING_BUCKETS, labels=AGING_LABELS, include_lowest=True).value_counts()
+
+    return {
+        "vehicles": int(len(inventory)),
+        "sold": int(len(sold)),
+        "unsold": int(len(unsold)),
+        "days_in_stock": {
+            "sold": day_stats(sold["days_in_stock"]),
+            "unsold": day_stats(unsold["days_in_stock"]),
+            "unsold_aging": {label: int(aging.get(label, 0)) for label in AGING_LABELS}
+        },
+        "profit": {
+            "total": round(float(sold["profit"].sum()), 2),
+            "average": round(float(sold["profit"].mean()), 2) if len(sold) else 0,
+            "by_make_model": records(by_model),
+            "by_month": records(by_month)
+        },
+        "reconditioning_per_vehicle": {
+            "mean": round(float(recon.mean()), 2) if recon.size else 0,
+            **{f"p{percentile}": round(float(value), 2) for percentile, value in zip(RECON_PERCENTILES, recon_percentiles)}
+        },
+        "trailing_12_months": records(trailing)
+    }
@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+# Latency/throughput benchmark for the read endpoints against synthetic dealers of 100, 1k and 10k
+# vehicles (with ~2 reports per vehicle), seeded into a scratch database. Requests go through the Flask
+# test client, so numbers cover routing, handlers and MongoDB but not the network or WSGI server.
+#   python api_bench.py                                  local mongod, database dealcost_bench
+#   python api_bench.py --mongo-uri mongodb://host:27017 --sizes 100 1000
+#   python api_bench.py --mongomock                      no mongod needed; mongomock lacks $convert,
+#                                                        so /api/dashboard reports errors there
+#   python api_bench.py --output new.json --compare baseline.json
+# With --compare the run exits 1 when any route's p50 or p99 is more than --threshold times the baseline.
+# Never point --mongo-uri at production: the bench dealers' documents are deleted and re-inserted.
+
+DEFAULT_SIZES = [100, 1000, 10000]
+REPORTS_PER_VEHICLE = 2
+SOLD_FRACTION = 0.4
+MAKES = [("Toyota", "Camry"), ("Honda", "Civic"), ("Ford", "F-150"), ("Chevrolet", "Malibu"), ("Nissan", "Altima"), ("BMW", "330i")]
+SALE_TYPES = ["dealer", "floor", "consignment"]
+CATEGORIES = ["mechanical", "body", "detail", "tires", "inspection"]
+
+ROUTES = {
+    "dashboard": "/api/dashboard?username={username}",
+    "inventory": "/api/inventory?username={username}",
+    "reports_monthly": "/api/reports/monthly?username={username}&month={month}&year={year}",
+    "reports_unsold": "/api/reports/unsold?username={username}",
+    "reports_monthly_profits": "/api/reports/monthly-profits?username={username}&month={month}&year={year}",
+    "reports_monthly_profits_12_months": "/api/reports/monthly-profits?username={username}&start={start}&end={end}",
+}
+
+# Helper to pick a random date within the last year, as (legacy '%m/%d/%Y' string, datetime)
+def random_date(rng, today):
+    day = datetime(today.year, today.month, today.day) - timedelta(days=rng.randint(0, 364))
+    return day.strftime('%m/%d/%Y'), day
+
+# Replace a bench dealer's inventory and reports with `size` synthetic vehicles
+def seed_dealer(app_module, username, size, seed):
+    rng = random.Random(seed)
+    today = datetime.now()
+    app_module.inventory_collection.delete_many({"username": username})
+    app_module.reports_collection.delete_many({"username": username})
+
+    vehicles, reports = [], []
+    for index in range(size):
+        make, model = rng.choice(MAKES)
+        purchase_price = rng.randint(4000, 45000)
+        date_added, _ = random_date(rng, today)
+        vehicle = app_module.build_vehicle_document({
+            "username": username,
+            "vin": f"{username.upper()}{index:08d}",
+            "make": make,
+            "model": model,
+            "year": rng.randint(2008, 2024),
+            "mileage": rng.randint(5000, 180000),
+            "color": rng.choice(["black", "white", "silver", "red", "blue"]),
+            "purchase_price": purchase_price,
+            "sale_price": purchase_price + rng.randint(-1000, 6000),
+            "sale_type": rng.choice(SALE_TYPES)
+        }, date_added)
+
+        if rng.random() < SOLD_FRACTION:
+            vehicle["sale_status"] = "sold"
+            vehicle["date_sold"], vehicle["date_sold_at"] = random_date(rng, today)
+
+        for _ in range(rng.randint(0, REPORTS_PER_VEHICLE * 2)):
+            cost = round(rng.uniform(25, 2500), 2)
+            date_occurred, date_occurred_at = random_date(rng, today)
+            reports.append({
+                "username": username,
+                "vin": vehicle["vin"],
+                "date_occurred": date_occurred,
+                "date_occurred_at": date_occurred_at,
+                "cost": f"{cost:.2f}",
+                "category": rng.choice(CATEGORIES),
+                "vendor": "Bench Auto Service",
+                "description": "synthetic report"
+            })
+            vehicle["reconditioning_total"] += cost
+            vehicle["report_count"] += 1
+        vehicles.append(vehicle)
+
+    for start in range(0, len(vehicles), 5000):
+        app_module.inventory_collection.insert_many(vehicles[start:start + 5000], ordered=False)
+    for start in range(0, len(reports), 5000):
+        app_module.reports_collection.insert_many(reports[start:start + 5000], ordered=False)
+    return len(reports)
+
+# Helper to read a percentile from a sorted list of latencies
+def percentile(latencies, fraction):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+# Time `iterations` requests to one URL (after warmup) with `concurrency` requests in flight
+def measure(test_client, url, iterations, warmup, concurrency):
+    for _ in range(warmup):
+        test_client.get(url)
+
+    def timed_request(_):
+        start = time.perf_counter()
+        response = test_client.get(url)
+        response.get_data()
+        return (time.perf_counter() - start) * 1000, response.status_code < 400
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed_request, range(iterations)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, ok in samples if ok)
+    errors = len(samples) - len(latencies)
+    if not latencies:
+        return {"errors": errors}
+    return {
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "errors": errors
+    }
+
+# Compare a report against a baseline; returns a list of human-readable regressions
+def find_regressions(report, baseline, threshold):
+    regressions = []
+    for size, routes in report["results"].items():
+        for route, stats in routes.items():
+            previous = baseline.get("results", {}).get(size, {}).get(route)
+            if not previous:
+                continue
+            if stats.get("errors", 0) > previous.get("errors", 0):
+                regressions.append(f"{size} vehicles {route}: errors {previous.get('errors', 0)} -> {stats['errors']}")
+            for metric in ("p50_ms", "p99_ms"):
+                if metric in stats and previous.get(metric) and stats[metric] > previous[metric] * threshold:
+                    regressions.append(f"{size} vehicles {route}: {metric} {previous[metric]} -> {stats[metric]}")
+    return regressions
+
+# Helper to label a report with the commit it was measured on
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read endpoint latency/throughput benchmark")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db-name", default="dealcost_bench")
+    parser.add_argument("--mongomock", action="store_true", help="use an in-memory mongomock database instead of mongod")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="vehicles per synthetic dealer")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the dealers seeded by a previous run")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", help="baseline JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed p50/p99 ratio over the baseline")
+    args = parser.parse_args()
+
+    # app.py reads its settings at import: point it at the scratch database, keep the dashboard
+    # snapshot cache from answering repeat requests, and keep per-request logging quiet
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ["MONGO_DB_NAME"] = args.db_name
+    os.environ["DASHBOARD_CACHE_TTL_SECONDS"] = "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("SESSION_SECRET_KEY", "api-bench")
+    os.environ.setdefault("SLOW_REQUEST_MS", str(10 ** 9))
+    if args.mongomock:
+        import mongomock
+        import pymongo
+        pymongo.MongoClient = lambda *client_args, **client_options: mongomock.MongoClient()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    if not args.mongomock:
+        app_module.ensure_indexes()
+
+    today = datetime.now()
+    report = {
+        "commit": current_commit(),
+        "created_at": today.isoformat(timespec="seconds"),
+        "backend": "mongomock" if args.mongomock else "mongod",
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "results": {}
+    }
+    first_month = (today.replace(day=1) - timedelta(days=334)).strftime('%Y-%m')
+    test_client = app_module.app.test_client()
+    for size in args.sizes:
+        username = f"bench_{size}"
+        if not args.skip_seed:
+            seed_start = time.perf_counter()
+            report_count = seed_dealer(app_module, username, size, seed=size)
+            print(f"Seeded {username}: {size} vehicles, {report_count} reports in {time.perf_counter() - seed_start:.1f}s", file=sys.stderr)
+
+        report["results"][str(size)] = {
+            name: measure(test_client, route.format(username=username, month=today.strftime('%B'), year=today.year,
+                                       start=first_month, end=today.strftime('%Y-%m')),
+                          args.iterations, args.warmup, args.concurrency)
+            for name, route in ROUTES.items()
+        }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = find_regressions(report, json.load(baseline_file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        raise SystemExit(1 if regressions else 0)
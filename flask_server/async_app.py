@@ -0,0 +1,410 @@
+import asyncio
+import hashlib
+import uuid
+import logging
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+from quart import Quart, Response, g, request, jsonify
+from logging_config import request_id_var
+from json_provider import BSONJSONProvider
+from app import (
+    MONGO_URI, MONGO_DB_NAME, MAX_PAGE_SIZE, DASHBOARD_CACHE_BACKEND, DASHBOARD_CACHE_TTL_SECONDS,
+    DASHBOARD_METRICS_SOURCE, MAX_CACHED_DASHBOARD_BYTES, mongo_client_options, reporting_read_preference,
+    check_session_request, scope_to_session, month_range, requested_month_span, group_by_month, build_dashboard_inventory_pipeline, build_month_reconditioning_pipeline
+)
+
+# Async variant of the read-heavy routes (inventory/report lists, dashboard and /api/reports/*) on
+# Quart + Motor, so a request waiting on MongoDB doesn't hold a worker thread. Responses match app.py;
+# writes stay on the sync app. Run it next to the sync server, e.g.
+#   hypercorn async_app:async_app --bind 0.0.0.0:5001 --workers 4
+# The dashboard only reuses cached snapshots with DASHBOARD_CACHE_BACKEND=mongo: the in-memory cache
+# lives in the sync server's processes, so its invalidations would never reach this one.
+
+async_app = Quart(__name__)
+async_app.json = BSONJSONProvider(async_app)
+logger = logging.getLogger("dealcost.async")
+
+motor_client = None
+db = None
+
+# Motor clients are bound to the event loop they were created on, so connect once the server's loop runs
+@async_app.before_serving
+async def connect_mongo():
+    global motor_client, db
+    motor_client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options())
+    db = motor_client[MONGO_DB_NAME]
+
+@async_app.after_serving
+async def close_mongo():
+    motor_client.close()
+
+# Read handles for the reporting endpoints, honouring MONGO_REPORTING_READ_PREFERENCE like app.py
+def reporting_collection(name):
+    return db.get_collection(name, read_preference=reporting_read_preference)
+
+@async_app.before_request
+async def assign_request_id():
+    request_id_var.set(request.headers.get('X-Request-ID') or uuid.uuid4().hex)
+
+# Same session token check as app.authenticate_request, so REQUIRE_SESSION_TOKEN and tenant scoping
+# hold whichever server a request lands on
+@async_app.before_request
+async def authenticate_request():
+    g.session = None
+    if request.method == 'OPTIONS':
+        return None
+
+    named = [request.args.get('username')] + [(request.view_args or {}).get(key) for key in ('username', 'user_id')]
+    g.session, error = check_session_request(request.headers.get('Authorization', ''), request.endpoint, named)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+    return None
+
+@async_app.after_request
+async def after_request(response):
+    response.headers['X-Request-ID'] = request_id_var.get()
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+    response.headers.add('Access-Control-Allow-Credentials', 'true')
+    return response
+
+# Async counterpart of app.list_documents_response: ?fields=, ?limit=&after= and ?format=ndjson
+async def list_documents_response(collection, query, key):
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    projection = {field: 1 for field in fields} or None
+    limit = request.args.get('limit')
+    after = request.args.get('after')
+    paginated = limit is not None or after is not None
+
+    query = dict(query)
+    if g.session and query.get("username") is None:
+        query.pop("username", None)
+        query = scope_to_session(query, g.session)
+    if after:
+        if not ObjectId.is_valid(after):
+            return jsonify({"error": "Invalid after cursor"}), 400
+        query["_id"] = {"$gt": ObjectId(after)}
+
+    cursor = collection.find(query, projection)
+    if paginated:
+        try:
+            limit = min(int(limit or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+        if limit < 1:
+            return jsonify({"error": "Invalid limit"}), 400
+        cursor = cursor.sort("_id", ASCENDING).limit(limit)
+
+    if request.args.get('format') == 'ndjson':
+        async def generate():
+            async for document in cursor:
+                yield async_app.json.dumps_bytes(document) + b"\n"
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    documents = await cursor.to_list(length=None)
+
+    response_data = {key: documents}
+    if paginated:
+        response_data["next_after"] = str(documents[-1]["_id"]) if len(documents) == limit else None
+    return jsonify(response_data), 200
+
+@async_app.route('/api/inventory', methods=['GET'])
+async def get_inventory():
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({"error": "Username is required"}), 400
+
+        return await list_documents_response(db.inventory, {"username": username}, "inventory")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@async_app.route('/api/reports', methods=['GET'])
+async def get_reports():
+    vin = request.args.get('vin')
+    if not vin:
+        return jsonify({"error": "VIN is required"}), 400
+
+    return await list_documents_response(db.reports, scope_to_session({"vin": vin}, g.session), "records")
+
+# Helper to fetch every document matching a query from a reporting collection
+async def find_all(collection_name, query, sort=None):
+    return await reporting_collection(collection_name).find(query, sort=sort).to_list(length=None)
+
+# Helper to run an aggregation and return its first result (or {})
+async def aggregate_first(collection_name, pipeline):
+    results = await reporting_collection(collection_name).aggregate(pipeline).to_list(length=1)
+    return results[0] if results else {}
+
+async def compute_dashboard_data(username, include):
+    today = datetime.now()
+    current_month_start, next_month_start = month_range(today.strftime('%B'), today.year)
+    use_monthly_metrics = DASHBOARD_METRICS_SOURCE == "monthly_metrics"
+
+    # None of these depend on each other, so they all go out to MongoDB at once
+    queries = {
+        "inventory_summary": aggregate_first("inventory", build_dashboard_inventory_pipeline(
+            username, current_month_start, next_month_start, include_month=not use_monthly_metrics
+        ))
+    }
+    if use_monthly_metrics:
+        queries["month_metrics"] = db.monthly_metrics.find_one({"_id": f"{username}|{current_month_start.strftime('%Y-%m')}"})
+    else:
+        queries["month_reconditioning"] = aggregate_first("reports", build_month_reconditioning_pipeline(
+            username, current_month_start, next_month_start
+        ))
+    if 'inventory' in include:
+        queries["inventory"] = find_all("inventory", {"username": username})
+    if 'reports' in include:
+        queries["reports"] = find_all("reports", {"username": username})
+    results = dict(zip(queries, await asyncio.gather(*queries.values())))
+
+    inventory_summary = results["inventory_summary"]
+    unsold = (inventory_summary.get('unsold') or [{}])[0]
+    if use_monthly_metrics:
+        month_metrics = results["month_metrics"] or {}
+        current_month_profit = month_metrics.get('profit', 0)
+        current_month_reconditioning = month_metrics.get('reconditioning_cost', 0)
+    else:
+        sold_this_month = (inventory_summary.get('sold_this_month') or [{}])[0]
+        current_month_profit = sold_this_month.get('current_month_profit', 0)
+        current_month_reconditioning = results["month_reconditioning"].get('total', 0)
+
+    response_data = {
+        "total_vehicles": unsold.get('total_vehicles', 0),
+        "total_inventory_value": unsold.get('total_inventory_value', 0),
+        "current_month_reconditioning_cost": current_month_reconditioning,
+        "current_month_profit": current_month_profit,
+        "current_month_name": today.strftime('%B'),
+        "total_floor_plan": unsold.get('total_floor_plan', 0),
+        "total_dealership": unsold.get('total_dealership', 0),
+        "total_consignment": unsold.get('total_consignment', 0),
+        "unsold_reconditioning_cost": unsold.get('unsold_reconditioning_cost', 0),
+    }
+    for key in ("inventory", "reports"):
+        if key in results:
+            response_data[key] = results[key]
+
+    return response_data
+
+@async_app.route('/api/dashboard', methods=['GET'])
+async def get_dashboard_data():
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({"error": "Username is required"}), 400
+
+        include = {part.strip() for part in request.args.get('include', '').split(',') if part.strip()}
+        include_key = ",".join(sorted(include))
+        use_cache = DASHBOARD_CACHE_BACKEND == "mongo"
+
+        # Same versioned keys as app.py: the version is read before computing, so a write that lands
+        # mid-compute retires the snapshot stored below
+        cached, version = None, None
+        if use_cache:
+            try:
+                version = ((await db.dashboard_versions.find_one({"_id": username})) or {}).get("version", 0)
+                cached = await db.dashboard_cache.find_one({
+                    "_id": f"{username}|{version}|{include_key}",
+                    "created_at": {"$gte": datetime.utcnow() - timedelta(seconds=DASHBOARD_CACHE_TTL_SECONDS)}
+                })
+            except PyMongoError as e:
+                logger.warning(f"Dashboard cache lookup failed: {str(e)}")
+
+        if cached:
+            body, etag = cached["body"], cached["etag"]
+        else:
+            body = async_app.json.dumps(await compute_dashboard_data(username, include))
+            etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+            if version is not None and len(body) <= MAX_CACHED_DASHBOARD_BYTES:
+                try:
+                    await db.dashboard_cache.replace_one(
+                        {"_id": f"{username}|{version}|{include_key}"},
+                        {"username": username, "version": version, "body": body, "etag": etag, "created_at": datetime.utcnow()},
+                        upsert=True
+                    )
+                except PyMongoError as e:
+                    logger.warning(f"Dashboard cache store failed: {str(e)}")
+
+        response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        if request.if_none_match.contains(etag):
+            response.status_code = 304
+            response.set_data(b"")
+        return response
+
+    except Exception as e:
+        logger.exception("Dashboard error")
+        return jsonify({"error": str(e)}), 500
+
+# Helper to fetch a dealer's documents for many VINs in one batched query, grouped by VIN
+async def load_by_vin(collection_name, username, vins):
+    vins = list({vin for vin in vins if vin})
+    if not vins:
+        return {}
+    by_vin = {}
+    async for document in reporting_collection(collection_name).find({"username": username, "vin": {"$in": vins}}):
+        by_vin.setdefault(document.get('vin'), []).append(document)
+    return by_vin
+
+def sum_report_costs(reports):
+    return sum(float(report.get('cost', 0)) for report in reports)
+
+async def attach_vehicle_details(username, reports):
+    vehicles_by_vin = await load_by_vin("inventory", username, (report.get('vin') for report in reports))
+    for report in reports:
+        vehicle = (vehicles_by_vin.get(report.get('vin')) or [None])[0]
+        if vehicle:
+            report['year'] = vehicle.get('year')
+            report['make'] = vehicle.get('make')
+            report['model'] = vehicle.get('model')
+    return reports
+
+@async_app.route('/api/reports/monthly', methods=['GET'])
+async def get_monthly_reconditioning():
+    try:
+        username = request.args.get('username')
+        try:
+            span = requested_month_span(request.args)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid month range: {str(e)}"}), 400
+
+        if span:
+            if not username:
+                return jsonify({"error": "Missing required parameters"}), 400
+            range_start, range_end, months = span
+            reports = await attach_vehicle_details(username, await find_all(
+                "reports",
+                {"username": username, "date_occurred_at": {"$gte": range_start, "$lt": range_end}},
+                sort=[("date_occurred_at", ASCENDING), ("_id", ASCENDING)]
+            ))
+            by_month = group_by_month(reports, "date_occurred_at", months)
+            return jsonify({
+                "months": [
+                    {"month": month, "reconditioning": month_reports, "total": sum_report_costs(month_reports)}
+                    for month, month_reports in by_month.items()
+                ],
+                "total": sum_report_costs(reports)
+            }), 200
+
+        month = request.args.get('month')
+        year = int(request.args.get('year'))
+
+        if not all([username, month, year]):
+            return jsonify({"error": "Missing required parameters"}), 400
+
+        month_start, month_end = month_range(month, year)
+        monthly_reconditioning = await attach_vehicle_details(username, await find_all("reports", {
+            "username": username,
+            "date_occurred_at": {"$gte": month_start, "$lt": month_end}
+        }))
+
+        return jsonify({
+            "reconditioning": monthly_reconditioning,
+            "total": sum_report_costs(monthly_reconditioning)
+        }), 200
+
+    except Exception as e:
+        logger.exception("Monthly reconditioning error")
+        return jsonify({"error": str(e)}), 500
+
+@async_app.route('/api/reports/unsold', methods=['GET'])
+async def get_unsold_reconditioning():
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({"error": "Missing username parameter"}), 400
+
+        unsold_inventory = await find_all("inventory", {"username": username, "sale_status": {"$ne": "sold"}})
+        reports_by_vin = await load_by_vin("reports", username, (vehicle.get("vin") for vehicle in unsold_inventory))
+        monthly_reconditioning = []
+        for vehicle in unsold_inventory:
+            for report in reports_by_vin.get(vehicle.get("vin"), []):
+                report['year'] = vehicle.get('year')
+                report['make'] = vehicle.get('make')
+                report['model'] = vehicle.get('model')
+                monthly_reconditioning.append(report)
+
+        return jsonify({
+            "reconditioning": monthly_reconditioning,
+            "total": sum_report_costs(monthly_reconditioning)
+        }), 200
+
+    except Exception as e:
+        logger.exception("Unsold reconditioning error")
+        return jsonify({"error": str(e)}), 500
+
+async def add_vehicle_profits(username, sold_vehicles):
+    missing_rollups = [vehicle.get("vin") for vehicle in sold_vehicles if "reconditioning_total" not in vehicle]
+    reports_by_vin = await load_by_vin("reports", username, missing_rollups)
+
+    for vehicle in sold_vehicles:
+        if "reconditioning_total" in vehicle:
+            reconditioning_cost = vehicle["reconditioning_total"]
+        else:
+            reconditioning_cost = sum_report_costs(reports_by_vin.get(vehicle.get("vin"), []))
+
+        sale_price = float(vehicle.get('sale_price', 0))
+        purchase_price = float(vehicle.get('purchase_price', 0))
+        vehicle['reconditioning_cost'] = reconditioning_cost
+        vehicle['profit'] = sale_price - purchase_price - reconditioning_cost
+    return sold_vehicles
+
+@async_app.route('/api/reports/monthly-profits', methods=['GET'])
+async def get_monthly_profits():
+    try:
+        username = request.args.get('username')
+        try:
+            span = requested_month_span(request.args)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid month range: {str(e)}"}), 400
+
+        if span:
+            if not username:
+                return jsonify({"error": "Missing required parameters"}), 400
+            range_start, range_end, months = span
+            sold_vehicles = await add_vehicle_profits(username, await find_all(
+                "inventory",
+                {"username": username, "sale_status": "sold", "date_sold_at": {"$gte": range_start, "$lt": range_end}},
+                sort=[("date_sold_at", ASCENDING), ("_id", ASCENDING)]
+            ))
+            by_month = group_by_month(sold_vehicles, "date_sold_at", months)
+            return jsonify({
+                "months": [
+                    {"month": month, "vehicles": vehicles, "profit": sum(vehicle['profit'] for vehicle in vehicles)}
+                    for month, vehicles in by_month.items()
+                ],
+                "profit": sum(vehicle['profit'] for vehicle in sold_vehicles)
+            }), 200
+
+        month = request.args.get('month')
+        year = int(request.args.get('year'))
+
+        if not all([username, month, year]):
+            return jsonify({"error": "Missing required parameters"}), 400
+
+        month_start, month_end = month_range(month, year)
+        sold_vehicles = await find_all("inventory", {
+            "username": username,
+            "sale_status": "sold",
+            "date_sold_at": {"$gte": month_start, "$lt": month_end}
+        })
+
+        return jsonify({"vehicles": await add_vehicle_profits(username, sold_vehicles)}), 200
+
+    except Exception as e:
+        logger.exception("Monthly profits error")
+        return jsonify({"error": str(e)}), 500
+
+@async_app.route('/api/ready', methods=['GET'])
+async def ready():
+    try:
+        await motor_client.admin.command("ping")
+        return jsonify({"status": "ready"}), 200
+    except PyMongoError as e:
+        return jsonify({"status": "unavailable", "error": str(e)}), 503
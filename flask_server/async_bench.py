@@ -0,0 +1,69 @@
+import json
+import time
+import argparse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Throughput comparison of the sync (app.py) and async (async_app.py) servers on the read routes.
+# Start both against the same database, then point this at them:
+#   gunicorn -c gunicorn.conf.py app:app                      (port 5000)
+#   hypercorn async_app:async_app --bind 0.0.0.0:5001 --workers 4
+#   python async_bench.py --username demo --sync http://localhost:5000 --async http://localhost:5001
+# For a fair comparison give both servers the same number of worker processes.
+
+# Read routes exercised in each round, formatted with the dealer's username, month and year
+ROUTES = [
+    "/api/inventory?username={username}",
+    "/api/dashboard?username={username}&include=inventory,reports",
+    "/api/reports/monthly?username={username}&month={month}&year={year}",
+    "/api/reports/unsold?username={username}",
+    "/api/reports/monthly-profits?username={username}&month={month}&year={year}",
+]
+
+# Fetch one URL and return its latency in milliseconds (None on an error response)
+def fetch(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+    except OSError:
+        return None
+    return (time.perf_counter() - start) * 1000
+
+# Hit every route `requests` times in total with `concurrency` requests in flight
+def run_load(base_url, paths, requests, concurrency):
+    urls = [base_url.rstrip("/") + paths[i % len(paths)] for i in range(requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+
+    succeeded = sorted(latency for latency in latencies if latency is not None)
+    if not succeeded:
+        return {"errors": len(latencies)}
+    return {
+        "requests_per_second": round(len(succeeded) / elapsed, 1),
+        "p50_ms": round(succeeded[len(succeeded) // 2], 1),
+        "p95_ms": round(succeeded[min(len(succeeded) - 1, int(len(succeeded) * 0.95))], 1),
+        "errors": len(latencies) - len(succeeded)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync vs async read route throughput")
+    parser.add_argument("--username", required=True, help="dealer whose data the routes read")
+    parser.add_argument("--sync", dest="sync_url", default="http://localhost:5000")
+    parser.add_argument("--async", dest="async_url", default="http://localhost:5001")
+    parser.add_argument("--month", default=time.strftime("%B"))
+    parser.add_argument("--year", default=time.strftime("%Y"))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    paths = [route.format(username=args.username, month=args.month, year=args.year) for route in ROUTES]
+    report = {}
+    for concurrency in args.concurrency:
+        report[concurrency] = {
+            "sync": run_load(args.sync_url, paths, args.requests, concurrency),
+            "async": run_load(args.async_url, paths, args.requests, concurrency)
+        }
+    print(json.dumps(report, indent=2))
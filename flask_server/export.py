@@ -0,0 +1,89 @@
+import io
+import csv
+import tempfile
+from datetime import date, datetime
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+except ImportError:  # openpyxl is optional; only ?format=xlsx needs it
+    Workbook = None
+
+# Streaming CSV/XLSX writers for /api/export. Rows are pulled from an iterator of documents one at a time,
+# so memory stays flat however many rows the cursor yields:
+#   CSV is yielded in ~64KB chunks while the cursor is read
+#   XLSX rows go to openpyxl's write-only workbook (which spools them to disk) and the finished file is
+#   streamed back from a temporary file
+
+CHUNK_BYTES = 64 * 1024
+
+MIMETYPES = {
+    "csv": "text/csv",  # Flask adds charset=utf-8
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Spreadsheet apps evaluate text cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Helper to tell amounts stored as text (e.g. "-125.50") from text that would be read as a formula
+def is_number(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+# Helper to turn a stored value into something both writers accept (dates are kept for XLSX)
+def cell_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, (list, dict)):
+        return str(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not is_number(value):
+        return "'" + value
+    return value
+
+def csv_value(value):
+    value = cell_value(value)
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+def xlsx_value(value):
+    value = cell_value(value)
+    return ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value
+
+def csv_chunks(fields, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([csv_value(row.get(field)) for field in fields])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+def xlsx_chunks(fields, rows, sheet_title):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(fields)
+    for row in rows:
+        sheet.append([xlsx_value(row.get(field)) for field in fields])
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        for chunk in iter(lambda: output.read(CHUNK_BYTES), b""):
+            yield chunk
+
+# Stream `rows` (dicts) as the given format, one column per field
+def export_chunks(export_format, fields, rows, sheet_title="Export"):
+    if export_format == "xlsx":
+        return xlsx_chunks(fields, rows, sheet_title)
+    return csv_chunks(fields, rows)
@@ -0,0 +1,42 @@
+import os
+import sys
+import subprocess
+import multiprocessing
+
+# Production entry point: run from flask_server/ with
+#   gunicorn -c gunicorn.conf.py app:app
+# Every setting can be overridden through the environment (or on the gunicorn command line).
+
+bind = os.getenv("GUNICORN_BIND", f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '5000')}")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_class = "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 0))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+# pymongo's MongoClient is not fork-safe, so the app is never imported in the master: each worker
+# imports app.py after it is forked and builds its own client and connection pool.
+preload_app = False
+
+# Run index provisioning and date/rollup backfills once, before any worker starts. They run in a
+# child process so the master never opens a MongoClient that workers would inherit.
+def on_starting(server):
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    subprocess.run([sys.executable, os.path.join(app_dir, "app.py"), "--startup-tasks"], cwd=app_dir, check=True)
+
+# Workers import app.py after this runs; the worker count lets it split per-process limits (OCR pool size
+# and queue) between them
+def post_fork(server, worker):
+    os.environ["GUNICORN_WORKERS"] = str(server.cfg.workers)
+    server.log.info(f"Worker {worker.pid} forked; it will open its own MongoDB connection pool")
+
+# On graceful shutdown (SIGTERM) finish in-flight requests, then close the OCR pool and Mongo connections
+def worker_exit(server, worker):
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.shutdown_resources()
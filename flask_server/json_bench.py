@@ -0,0 +1,78 @@
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+import json_provider
+
+# Serialization time for an /api/inventory response of synthetic vehicles, comparing the old
+# str(_id)-loop + Flask default provider against BSONJSONProvider with the stdlib encoder and with orjson.
+# Usage: python json_bench.py [--vehicles 5000] [--iterations 20]
+
+# Helper to build inventory documents shaped like the ones pymongo returns (ObjectId _id, native dates)
+def synthetic_inventory(count):
+    rng = random.Random(count)
+    today = datetime(2024, 6, 1)
+    vehicles = []
+    for index in range(count):
+        added = today - timedelta(days=rng.randint(0, 365))
+        vehicles.append({
+            "_id": ObjectId(), "username": "bench", "vin": f"BENCH{index:012d}", "make": "Toyota",
+            "model": "Camry", "trim": "LE", "year": rng.randint(2008, 2024), "mileage": rng.randint(5000, 180000),
+            "color": "silver", "purchase_price": float(rng.randint(4000, 45000)), "sale_price": 0.0,
+            "sale_status": "available", "date_added": added.strftime('%m/%d/%Y'), "date_added_at": added,
+            "date_sold": "", "date_sold_at": None, "reconditioning_total": round(rng.uniform(0, 3000), 2),
+            "report_count": rng.randint(0, 4), "sale_type": "dealer", "closing_statement": "", "finance_type": "",
+            "purchase_date": "", "title_received": "", "inspection_received": "no", "pending_issues": "",
+            "inspection_status": "", "purchaser": "", "posted_online": ""
+        })
+    return vehicles
+
+# Time building the full JSON response body `iterations` times; returns milliseconds per response
+def time_response(app, make_documents, serialize, iterations):
+    timings = []
+    with app.app_context():
+        for _ in range(iterations):
+            documents = make_documents()
+            start = time.perf_counter()
+            body = serialize(documents)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {"median_ms": round(timings[len(timings) // 2], 2), "min_ms": round(timings[0], 2), "bytes": len(body)}
+
+# The previous list-endpoint path: rewrite every _id, then jsonify with Flask's default provider
+def legacy_serialize(documents):
+    for document in documents:
+        document["_id"] = str(document["_id"])
+    return jsonify({"inventory": documents}).get_data()
+
+def provider_serialize(documents):
+    return jsonify({"inventory": documents}).get_data()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inventory response serialization benchmark")
+    parser.add_argument("--vehicles", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    inventory = synthetic_inventory(args.vehicles)
+    # Fresh shallow copies each iteration so the legacy loop always starts from ObjectIds
+    make_documents = lambda: [dict(document) for document in inventory]
+
+    legacy_app = Flask("legacy")
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    provider_app = Flask("provider")
+    provider_app.json = json_provider.BSONJSONProvider(provider_app)
+
+    report = {"vehicles": args.vehicles, "iterations": args.iterations}
+    report["legacy_default_provider"] = time_response(legacy_app, make_documents, legacy_serialize, args.iterations)
+    if json_provider.orjson:
+        report["bson_provider_orjson"] = time_response(provider_app, make_documents, provider_serialize, args.iterations)
+
+    orjson_module, json_provider.orjson = json_provider.orjson, None
+    report["bson_provider_stdlib"] = time_response(provider_app, make_documents, provider_serialize, args.iterations)
+    json_provider.orjson = orjson_module
+    print(json.dumps(report, indent=2))
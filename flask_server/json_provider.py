@@ -0,0 +1,58 @@
+import decimal
+from datetime import date, datetime
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is slower
+    orjson = None
+
+# JSON provider that encodes MongoDB documents as they come out of pymongo, so routes can return
+# them without first rewriting every _id. Both encoders map the BSON types the same way:
+#   ObjectId -> its hex string, datetime/date -> ISO 8601, Decimal128/Decimal -> decimal string
+# and anything else Flask's default provider supports (UUID, dataclasses, __html__) is left to it.
+# The output is equivalent JSON but not byte-identical between the two: float formatting differs
+# (orjson writes 1e16 where the stdlib writes 1e+16). Keys stay sorted (as with Flask's default
+# provider), which keeps dashboard ETags stable for a given encoder.
+
+# Helper to encode the types neither encoder handles natively, falling back to Flask's default handler
+def encode_bson_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return _default(value)
+
+class BSONJSONProvider(DefaultJSONProvider):
+    ensure_ascii = False  # orjson always writes UTF-8
+
+    def default_options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+        if orjson and self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    # Serialize to UTF-8 bytes; the response path uses this directly to skip a decode/encode round trip
+    def dumps_bytes(self, obj, indent=False):
+        if orjson:
+            return orjson.dumps(obj, default=encode_bson_value,
+                                option=self.default_options() | (orjson.OPT_INDENT_2 if indent else 0))
+        layout = {"indent": 2} if indent else {"separators": (",", ":")}
+        return super().dumps(obj, default=encode_bson_value, **layout).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            return self.dumps_bytes(obj).decode("utf-8")
+        kwargs.setdefault("default", encode_bson_value)
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,101 @@
+import os
+import sys
+import copy
+import json
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+import contextvars
+from datetime import datetime, timezone
+
+# Leveled, structured logging shared by the API servers, the metrics worker and the OCR processes.
+# Records are handed to a queue and written by a background thread, so request threads never block
+# on stdout. Settings (environment):
+#   LOG_LEVEL              DEBUG, INFO (default), WARNING, ...
+#   LOG_FORMAT             json (default) or text
+#   LOG_DEBUG_SAMPLE_RATE  fraction of DEBUG records kept, e.g. 0.01 (default 1)
+# Extra fields go through `extra`, e.g. logger.info("Vehicle updated", extra={"vin": vin}).
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1))
+
+# Id of the request being handled, set by the servers' before_request hooks ("-" outside a request)
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+STANDARD_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+# Stamps each record with the current request id
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+# Keeps every INFO-and-above record but only a sample of DEBUG records
+class DebugSamplingFilter(logging.Filter):
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+# One JSON object per line: timestamp, level, logger, request id, message and any extra fields
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in STANDARD_RECORD_FIELDS})
+        if record.exc_info or record.exc_text:
+            entry["exception"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+# Queue handler that keeps the exception separate from the message so the formatter can structure it
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+listener = None
+configured_pid = None
+
+# Route the root logger through a queue drained by a background thread; safe to call more than once,
+# and called again in forked children (OCR worker processes) since the listener thread doesn't survive a fork
+def configure_logging():
+    global listener, configured_pid
+    if configured_pid == os.getpid():
+        return
+    configured_pid = os.getpid()
+
+    output = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    # Filters run on the calling thread so the request id is captured before the record is queued
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(DebugSamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import time
+import argparse
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Logins per second per core for candidate PASSWORD_HASH_METHOD settings. Password verification
+# dominates a login, so each method is timed with check_password_hash on one thread; --end-to-end
+# also drives POST /api/login through the Flask test client against an in-memory mongomock database.
+# Usage: python login_bench.py [--methods pbkdf2:sha256 pbkdf2:sha256:150000 scrypt:32768:8:1] [--seconds 3]
+
+DEFAULT_METHODS = ["pbkdf2:sha256", "pbkdf2:sha256:260000", "pbkdf2:sha256:150000", "scrypt:32768:8:1", "scrypt:16384:8:1"]
+
+# Count password checks completed on one core in roughly `seconds`
+def checks_per_second(password_hash, password, seconds):
+    checks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        check_password_hash(password_hash, password)
+        checks += 1
+    return checks / (time.perf_counter() - start)
+
+# Count successful logins through the real route in roughly `seconds`, with the given hash method
+def logins_per_second(method, seconds):
+    os.environ["PASSWORD_HASH_METHOD"] = method
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/")  # Never contacted: the client is mongomock
+    os.environ.setdefault("SESSION_SECRET_KEY", "login-bench")
+    import mongomock
+    import pymongo
+    pymongo.MongoClient = lambda *client_args, **client_options: mongomock.MongoClient()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    app_module.PASSWORD_HASH_METHOD, app_module.password_hash_prefix = method, None
+    app_module.users_collection.delete_many({"username": "bench"})
+    app_module.users_collection.insert_one({"username": "bench", "password": app_module.hash_password("bench-password"), "company_name": "Bench"})
+    test_client = app_module.app.test_client()
+
+    logins = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        response = test_client.post("/api/login", json={"username": "bench", "password": "bench-password"})
+        if response.status_code != 200:
+            raise SystemExit(f"Login failed during benchmark: {response.status_code} {response.get_json()}")
+        logins += 1
+    return logins / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password hashing cost vs logins/sec per core")
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--seconds", type=float, default=3, help="timing window per method")
+    parser.add_argument("--end-to-end", action="store_true", help="also time POST /api/login (needs mongomock)")
+    args = parser.parse_args()
+
+    report = {}
+    for method in args.methods:
+        password_hash = generate_password_hash("bench-password", method=method)
+        report[method] = {
+            "stored_prefix": password_hash.split("$", 1)[0],
+            "checks_per_second_per_core": round(checks_per_second(password_hash, "bench-password", args.seconds), 1)
+        }
+        if args.end_to_end:
+            report[method]["logins_per_second_per_core"] = round(logins_per_second(method, args.seconds), 1)
+    print(json.dumps(report, indent=2))
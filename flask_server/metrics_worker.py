@@ -0,0 +1,292 @@
+import os
+import signal
+import argparse
+import logging
+import threading
+from datetime import datetime
+from pymongo.errors import PyMongoError
+from app import (
+    client, db, inventory_collection, reports_collection, monthly_metrics_collection,
+    metrics_state_collection, invalidate_dashboard, parse_cost, to_double_expr
+)
+
+# Background worker that tails change streams on inventory and reports and keeps one document per
+# dealer per month in monthly_metrics current:
+#   {_id: "<username>|<YYYY-MM>", username, month, units_sold, revenue, profit, reconditioning_cost,
+#    report_count, by_sale_type: {<sale_type>: {units_sold, profit}}}
+# Every change is applied as (post-image contribution - pre-image contribution), so inserts, updates,
+# deletes and vehicles moving between months or sale types all reduce to the same $inc. Events whose
+# pre-image is unavailable (expired or recorded before pre-images were enabled) resync the dealer instead,
+# from a snapshot read; later events already included in that snapshot are skipped rather than applied again.
+#
+# Change streams need a replica set; pre-images need MongoDB 6.0+ (enabled on startup via collMod).
+# Usage: python metrics_worker.py            run the worker, resuming from the stored token
+#        python metrics_worker.py --rebuild  recompute every month from scratch, then exit
+
+STREAM_NAME = "monthly_metrics"
+WATCHED_COLLECTIONS = [inventory_collection.name, reports_collection.name]
+logger = logging.getLogger("dealcost.metrics_worker")
+RETRY_DELAY_SECONDS = int(os.getenv("METRICS_WORKER_RETRY_SECONDS", 5))
+
+# Helper to turn a native datetime field into the "YYYY-MM" month key (None when missing)
+def month_key(value):
+    return value.strftime('%Y-%m') if isinstance(value, datetime) else None
+
+# Helper to make a sale type safe to use inside a dotted field path
+def sale_type_key(sale_type):
+    return (sale_type or "na").replace(".", "_").replace("$", "_")
+
+# What a single report adds to its dealer's month: [((username, month), {field: amount})]
+def report_contributions(report):
+    month = month_key((report or {}).get("date_occurred_at"))
+    if not month or not report.get("username"):
+        return []
+    return [((report["username"], month), {
+        "reconditioning_cost": parse_cost(report.get("cost")),
+        "report_count": 1
+    })]
+
+# What a single vehicle adds to the month it was sold in (nothing unless it is sold)
+def vehicle_contributions(vehicle):
+    if not vehicle or vehicle.get("sale_status") != "sold":
+        return []
+    month = month_key(vehicle.get("date_sold_at"))
+    if not month or not vehicle.get("username"):
+        return []
+
+    sale_price = parse_cost(vehicle.get("sale_price"))
+    profit = sale_price - parse_cost(vehicle.get("purchase_price")) - parse_cost(vehicle.get("reconditioning_total"))
+    sale_type = sale_type_key(vehicle.get("sale_type"))
+    return [((vehicle["username"], month), {
+        "units_sold": 1,
+        "revenue": sale_price,
+        "profit": profit,
+        f"by_sale_type.{sale_type}.units_sold": 1,
+        f"by_sale_type.{sale_type}.profit": profit
+    })]
+
+CONTRIBUTIONS = {
+    inventory_collection.name: vehicle_contributions,
+    reports_collection.name: report_contributions
+}
+
+# Turn one change event into {(username, month): {field: delta}}, dropping fields that net to zero
+def change_deltas(event):
+    contribute = CONTRIBUTIONS[event["ns"]["coll"]]
+    deltas = {}
+    for sign, document in ((-1, event.get("fullDocumentBeforeChange")), (1, event.get("fullDocument"))):
+        for key, values in contribute(document):
+            bucket = deltas.setdefault(key, {})
+            for field, amount in values.items():
+                bucket[field] = bucket.get(field, 0) + sign * amount
+
+    deltas = {key: {field: amount for field, amount in values.items() if amount} for key, values in deltas.items()}
+    return {key: values for key, values in deltas.items() if values}
+
+# Update, replace and delete events need the pre-image to take the old contribution back out. With
+# full_document_before_change="whenAvailable" a missing one arrives as fullDocumentBeforeChange: null
+def missing_pre_image(event):
+    return event["operationType"] in ("update", "replace", "delete") and event.get("fullDocumentBeforeChange") is None
+
+# Helper to list the dealers whose metrics a change event touches
+def event_usernames(event):
+    documents = (event.get("fullDocumentBeforeChange"), event.get("fullDocument"))
+    return {document["username"] for document in documents if document and document.get("username")}
+
+# Helper to tell whether an event is already reflected in a resync: one that read every dealer it touches
+# (or all dealers, username None) at or after the event's cluster time
+def covered_by_resync(event, resyncs):
+    cluster_time = event.get("clusterTime")
+    if cluster_time is None:
+        return False
+    covered = {resync["username"] for resync in resyncs if cluster_time <= resync["read_at"]}
+    usernames = event_usernames(event)
+    return None in covered or bool(usernames) and usernames <= covered
+
+# Compute one dealer's (or every dealer's) months from a single snapshot of the collections; returns the
+# months and the cluster time the snapshot was read at
+def snapshot_monthly_metrics(username=None):
+    with client.start_session(snapshot=True) as snapshot:
+        months = compute_monthly_metrics(username, session=snapshot)
+        return months, snapshot.operation_time
+
+# Apply one change event to the monthly metrics and record its resume token (pass a session to make both atomic)
+def apply_change_event(event, metrics_collection=monthly_metrics_collection,
+                       state_collection=metrics_state_collection, session=None):
+    state = state_collection.find_one({"_id": STREAM_NAME}, session=session) or {}
+    resyncs = state.get("resyncs", [])
+
+    if covered_by_resync(event, resyncs):
+        # An earlier resync's snapshot already includes this write
+        usernames = set()
+    elif missing_pre_image(event):
+        # No delta can be computed, so recompute the dealer's months from a snapshot of the collections
+        # (every dealer's when a delete leaves nothing saying whose document it was), and remember when it
+        # was read so the events it already includes are skipped
+        username = (event.get("fullDocument") or {}).get("username")
+        logger.warning(f"Missing pre-image for {event['ns']['coll']} {event['operationType']}; "
+                       f"resyncing {username or 'all dealers'}")
+        usernames = {username} if username else set(metrics_collection.distinct("username", session=session))
+        months, read_at = snapshot_monthly_metrics(username)
+        metrics_collection.delete_many({"username": username} if username else {}, session=session)
+        if months:
+            metrics_collection.insert_many(months, session=session)
+        usernames |= {month["username"] for month in months}
+        resyncs = resyncs + [{"username": username, "read_at": read_at}]
+    else:
+        deltas = change_deltas(event)
+        for (username, month), values in deltas.items():
+            metrics_collection.update_one(
+                {"_id": f"{username}|{month}"},
+                {
+                    "$inc": values,
+                    "$setOnInsert": {"username": username, "month": month},
+                    "$set": {"updated_at": datetime.utcnow()}
+                },
+                upsert=True,
+                session=session
+            )
+        usernames = {username for username, _ in deltas}
+
+    # Resyncs read before this event can't cover any later one
+    cluster_time = event.get("clusterTime")
+    if cluster_time is not None:
+        resyncs = [resync for resync in resyncs if resync["read_at"] >= cluster_time]
+    state_collection.update_one(
+        {"_id": STREAM_NAME},
+        {"$set": {"resume_token": event["_id"], "resyncs": resyncs, "updated_at": datetime.utcnow()}},
+        upsert=True,
+        session=session
+    )
+    return usernames
+
+# Pre-images let update and delete events report what the document looked like before the change
+def enable_pre_and_post_images():
+    for name in WATCHED_COLLECTIONS:
+        try:
+            db.command("collMod", name, changeStreamPreAndPostImages={"enabled": True})
+        except PyMongoError as e:
+            logger.warning(f"Could not enable pre-images on {name}: {str(e)}")
+
+# Open the change stream over the watched collections, resuming after resume_token when given
+def open_change_stream(resume_token=None):
+    return db.watch(
+        [{"$match": {"ns.coll": {"$in": WATCHED_COLLECTIONS}}}],
+        full_document="whenAvailable",
+        full_document_before_change="whenAvailable",
+        resume_after=resume_token,
+        max_await_time_ms=1000
+    )
+
+# Tail the change stream until stop_event is set, applying each event in its own transaction
+def run_worker(stop_event):
+    enable_pre_and_post_images()
+    while not stop_event.is_set():
+        state = metrics_state_collection.find_one({"_id": STREAM_NAME}) or {}
+        try:
+            with open_change_stream(state.get("resume_token")) as stream:
+                logger.info(f"Metrics worker watching {WATCHED_COLLECTIONS}")
+                while stream.alive and not stop_event.is_set():
+                    event = stream.try_next()
+                    if event is None:
+                        continue
+                    with client.start_session() as session:
+                        usernames = session.with_transaction(lambda s: apply_change_event(event, session=s))
+                    # Cached dashboards would otherwise show the old month totals until their TTL
+                    for username in usernames:
+                        invalidate_dashboard(username)
+        except PyMongoError as e:
+            logger.warning(f"Metrics worker stream error, retrying in {RETRY_DELAY_SECONDS}s: {str(e)}")
+            stop_event.wait(RETRY_DELAY_SECONDS)
+
+# Compute monthly metrics documents from the collections as they stand, for one dealer or (None) all of them
+def compute_monthly_metrics(username=None, session=None):
+    months = {}
+    dealer = {"username": username} if username else {}
+
+    def bucket(username, month):
+        return months.setdefault((username, month), {
+            "_id": f"{username}|{month}", "username": username, "month": month,
+            "units_sold": 0, "revenue": 0.0, "profit": 0.0, "reconditioning_cost": 0.0,
+            "report_count": 0, "by_sale_type": {}
+        })
+
+    for group in inventory_collection.aggregate([
+        {"$match": {**dealer, "sale_status": "sold", "date_sold_at": {"$type": "date"}}},
+        {"$group": {
+            "_id": {
+                "username": "$username",
+                "month": {"$dateToString": {"format": "%Y-%m", "date": "$date_sold_at"}},
+                "sale_type": "$sale_type"
+            },
+            "units_sold": {"$sum": 1},
+            "revenue": {"$sum": to_double_expr("$sale_price")},
+            "profit": {"$sum": {"$subtract": [
+                {"$subtract": [to_double_expr("$sale_price"), to_double_expr("$purchase_price")]},
+                to_double_expr("$reconditioning_total")
+            ]}}
+        }}
+    ], allowDiskUse=True, session=session):
+        key = group["_id"]
+        month = bucket(key["username"], key["month"])
+        month["units_sold"] += group["units_sold"]
+        month["revenue"] += group["revenue"]
+        month["profit"] += group["profit"]
+        by_type = month["by_sale_type"].setdefault(sale_type_key(key.get("sale_type")), {"units_sold": 0, "profit": 0.0})
+        by_type["units_sold"] += group["units_sold"]
+        by_type["profit"] += group["profit"]
+
+    for group in reports_collection.aggregate([
+        {"$match": {**dealer, "date_occurred_at": {"$type": "date"}}},
+        {"$group": {
+            "_id": {
+                "username": "$username",
+                "month": {"$dateToString": {"format": "%Y-%m", "date": "$date_occurred_at"}}
+            },
+            "reconditioning_cost": {"$sum": to_double_expr("$cost")},
+            "report_count": {"$sum": 1}
+        }}
+    ], allowDiskUse=True, session=session):
+        month = bucket(group["_id"]["username"], group["_id"]["month"])
+        month["reconditioning_cost"] += group["reconditioning_cost"]
+        month["report_count"] += group["report_count"]
+
+    now = datetime.utcnow()
+    for month in months.values():
+        month["updated_at"] = now
+    return list(months.values())
+
+# Replace one dealer's (or every dealer's) monthly metrics with freshly computed ones
+def replace_monthly_metrics(username=None, metrics_collection=monthly_metrics_collection, session=None):
+    months = compute_monthly_metrics(username, session=session)
+    metrics_collection.delete_many({"username": username} if username else {}, session=session)
+    if months:
+        metrics_collection.insert_many(months, session=session)
+    return months
+
+# Recompute every dealer's monthly metrics from scratch and restart the stream from the current position
+# (run with writes quiesced: changes made while it runs are not replayed afterwards)
+def rebuild_monthly_metrics():
+    months = replace_monthly_metrics()
+    with open_change_stream() as stream:
+        metrics_state_collection.update_one(
+            {"_id": STREAM_NAME},
+            {"$set": {"resume_token": stream.resume_token, "resyncs": [], "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    logger.info(f"Monthly metrics rebuilt: {len(months)} dealer-months")
+    return len(months)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental monthly metrics worker")
+    parser.add_argument("--rebuild", action="store_true", help="recompute all monthly metrics, then exit")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_monthly_metrics()
+        raise SystemExit(0)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    run_worker(stop_event)
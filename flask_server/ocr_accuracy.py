@@ -0,0 +1,64 @@
+import os
+import json
+import time
+import argparse
+import receipt_ocr
+
+# Measures receipt extraction accuracy and latency with and without preprocessing.
+# A fixture set is a directory of receipt images, each with a sidecar JSON of expected fields:
+#   fixtures/oil_change.jpg + fixtures/oil_change.json -> {"date_occurred": "...", "service_provider": "...", "cost": "..."}
+# Usage: python ocr_accuracy.py path/to/fixtures
+# No fixture set is committed, so preprocessing has not been measured against real receipts; run this on
+# a set of real photos before turning on OCR_BINARIZE or OCR_CROP_TEXT_REGION by default.
+
+FIELDS = ["date_occurred", "service_provider", "cost"]
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".heic", ".webp")
+
+# Helper to pair every fixture image with its expected fields
+def load_fixtures(directory):
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        base, extension = os.path.splitext(name)
+        expected_path = os.path.join(directory, base + ".json")
+        if extension.lower() in IMAGE_EXTENSIONS and os.path.exists(expected_path):
+            with open(os.path.join(directory, name), "rb") as image_file, open(expected_path) as expected_file:
+                fixtures.append((name, image_file.read(), json.load(expected_file)))
+    return fixtures
+
+# Run every fixture through the OCR pipeline and summarize per-field accuracy and latency
+def evaluate(fixtures, preprocess):
+    correct = {field: 0 for field in FIELDS}
+    latencies = []
+    for name, image_bytes, expected in fixtures:
+        start = time.perf_counter()
+        result = receipt_ocr.ocr_receipt(image_bytes, preprocess=preprocess)
+        latencies.append((time.perf_counter() - start) * 1000)
+        for field in FIELDS:
+            if expected.get(field) is not None and result.get(field) == expected[field]:
+                correct[field] += 1
+            elif expected.get(field) is not None:
+                print(f"  {name}: {field} expected {expected[field]!r}, got {result.get(field)!r}")
+
+    latencies.sort()
+    return {
+        "accuracy": {field: round(correct[field] / len(fixtures), 3) for field in FIELDS},
+        "mean_ms": round(sum(latencies) / len(latencies), 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Receipt OCR accuracy and latency report")
+    parser.add_argument("fixtures", help="directory of receipt images with sidecar .json expectations")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        raise SystemExit(f"No fixtures found in {args.fixtures}")
+
+    report = {
+        "fixtures": len(fixtures),
+        "pipeline_version": receipt_ocr.OCR_PIPELINE_VERSION,
+        "raw": evaluate(fixtures, preprocess=False),
+        "preprocessed": evaluate(fixtures, preprocess=True)
+    }
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,118 @@
+import re
+from datetime import datetime
+
+# Single-pass receipt field extraction: the OCR text is split into lines once, every line is
+# matched against the precompiled patterns below, and the best scoring date, total and vendor win.
+
+MONTH_NAMES = "jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec"
+
+DATE_PATTERN = re.compile(
+    r'\b(?:'
+    r'(?P<mdy>(?P<m1>\d{1,2})[/-](?P<d1>\d{1,2})[/-](?P<y1>\d{4}|\d{2}))'
+    r'|(?P<ymd>(?P<y2>\d{4})[/-](?P<m2>\d{1,2})[/-](?P<d2>\d{1,2}))'
+    r'|(?P<named>(?P<mon>' + MONTH_NAMES + r')[a-z]*\.?\s+(?P<d3>\d{1,2}),?\s+(?P<y3>\d{4}))'
+    r')\b',
+    re.IGNORECASE
+)
+AMOUNT_PATTERN = re.compile(r'(?<![\d.])(?P<dollar>\$\s?)?(?P<value>\d{1,3}(?:,\d{3})+(?:\.\d{2})?|\d+\.\d{2}|\d+)(?![\d.,]*\d)')
+PHONE_PATTERN = re.compile(r'\(?\b\d{3}\)?[-.\s]\d{3}[-.\s]\d{4}\b')
+LETTER_PATTERN = re.compile(r'[A-Za-z]')
+
+TOTAL_KEYWORDS = re.compile(r'\b(grand\s+total|total\s+due|amount\s+due|balance\s+due|total|amount|balance)\b', re.IGNORECASE)
+SUBTOTAL_KEYWORDS = re.compile(r'\b(sub\s*-?\s*total)\b', re.IGNORECASE)
+NON_TOTAL_KEYWORDS = re.compile(r'\b(tax|change|cash|tendered|discount|qty|quantity|tip|saved|savings|invoice\s*#|order\s*#|acct|account)\b', re.IGNORECASE)
+DATE_KEYWORDS = re.compile(r'\b(date|dated|invoice\s+date|service\s+date)\b', re.IGNORECASE)
+NON_VENDOR_KEYWORDS = re.compile(r'\b(receipt|invoice|estimate|customer|date|time|phone|tel|fax|www|http|email|thank|welcome|cashier|order|total|subtotal|tax|vin|mileage|page)\b', re.IGNORECASE)
+STREET_ADDRESS = re.compile(r'^\s*\d+\s+\w+')
+
+# Vendors are almost always printed in the first few lines of a receipt
+VENDOR_SEARCH_LINES = 8
+
+MONTH_NUMBERS = {name: number for number, name in enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+# Helper to turn a date match into a normalized '%m/%d/%Y' string (None if it isn't a real date)
+def normalize_date(match):
+    if match.group('mdy'):
+        month, day, year = match.group('m1'), match.group('d1'), match.group('y1')
+    elif match.group('ymd'):
+        month, day, year = match.group('m2'), match.group('d2'), match.group('y2')
+    else:
+        month, day, year = MONTH_NUMBERS[match.group('mon')[:3].lower()], match.group('d3'), match.group('y3')
+
+    year = int(year)
+    if year < 100:
+        year += 2000
+    try:
+        return datetime(year, int(month), int(day)).strftime('%m/%d/%Y')
+    except ValueError:
+        return None
+
+# Score a candidate total; keyword lines dominate, then dollar signs and cents, then the larger amount
+def score_amount(line, match, value):
+    score = 0
+    if TOTAL_KEYWORDS.search(line) and not SUBTOTAL_KEYWORDS.search(line):
+        score += 100
+    elif SUBTOTAL_KEYWORDS.search(line):
+        score += 40
+    if NON_TOTAL_KEYWORDS.search(line):
+        score -= 60
+    if match.group('dollar'):
+        score += 20
+    if '.' in match.group('value'):
+        score += 20
+    return (score, value)
+
+# Score a candidate vendor line; earlier, mostly alphabetic, upper-case lines look most like a business name
+def score_vendor(line, line_number):
+    letters = len(LETTER_PATTERN.findall(line))
+    score = 50 - line_number * 5 + min(letters, 20)
+    if line.isupper():
+        score += 10
+    return score
+
+# Extract the date, vendor and cost from OCR text in a single pass over its lines
+def extract_receipt_fields(text):
+    best_date, best_total, best_vendor = None, None, None
+
+    for line_number, raw_line in enumerate(text.splitlines()):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        # Blank out phone numbers and dates first so their digits never look like amounts
+        masked = PHONE_PATTERN.sub(' ', line)
+        has_date = False
+        for match in DATE_PATTERN.finditer(masked):
+            date = normalize_date(match)
+            if not date:
+                continue
+            has_date = True
+            score = (1 if DATE_KEYWORDS.search(line) else 0, -line_number)
+            if best_date is None or score > best_date[0]:
+                best_date = (score, date)
+        masked = DATE_PATTERN.sub(' ', masked)
+
+        has_amount = False
+        for match in AMOUNT_PATTERN.finditer(masked):
+            digits = match.group('value')
+            # Bare integers without a $ or cents are usually zip codes, quantities or reference numbers
+            if not match.group('dollar') and '.' not in digits:
+                continue
+            has_amount = True
+            value = float(digits.replace(',', ''))
+            score = score_amount(line, match, value)
+            if best_total is None or score > best_total[0]:
+                best_total = (score, value)
+
+        if (line_number < VENDOR_SEARCH_LINES and not has_date and not has_amount
+                and len(LETTER_PATTERN.findall(line)) > 3 and not PHONE_PATTERN.search(line)
+                and not NON_VENDOR_KEYWORDS.search(line) and not STREET_ADDRESS.match(line)):
+            score = score_vendor(line, line_number)
+            if best_vendor is None or score > best_vendor[0]:
+                best_vendor = (score, line)
+
+    return {
+        "date_occurred": best_date[1] if best_date else None,
+        "service_provider": best_vendor[1] if best_vendor else None,
+        "cost": f"${best_total[1]:,.2f}" if best_total else None
+    }
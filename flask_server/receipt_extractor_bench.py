@@ -0,0 +1,43 @@
+import os
+import json
+import time
+import argparse
+from receipt_extractor import extract_receipt_fields
+
+# Accuracy and speed report for the receipt field extractor over the OCR text corpus.
+# Usage: python receipt_extractor_bench.py [--corpus receipt_corpus.json] [--iterations 2000]
+# receipt_corpus.json is 12 hand-written text samples (no images, no OCR noise) written alongside the
+# extractor, so its accuracy figures are a regression check, not an estimate for real receipts.
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "receipt_corpus.json")
+FIELDS = ["date_occurred", "service_provider", "cost"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Receipt extractor accuracy and benchmark")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSON list of {name, text, expected}")
+    parser.add_argument("--iterations", type=int, default=2000, help="passes over the corpus for the timing run")
+    args = parser.parse_args()
+
+    with open(args.corpus) as corpus_file:
+        corpus = json.load(corpus_file)
+
+    correct = {field: 0 for field in FIELDS}
+    for sample in corpus:
+        result = extract_receipt_fields(sample["text"])
+        for field in FIELDS:
+            if result[field] == sample["expected"][field]:
+                correct[field] += 1
+            else:
+                print(f"  {sample['name']}: {field} expected {sample['expected'][field]!r}, got {result[field]!r}")
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        for sample in corpus:
+            extract_receipt_fields(sample["text"])
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "samples": len(corpus),
+        "accuracy": {field: round(correct[field] / len(corpus), 3) for field in FIELDS},
+        "microseconds_per_receipt": round(elapsed / (args.iterations * len(corpus)) * 1e6, 1)
+    }, indent=2))
@@ -0,0 +1,103 @@
+import os
+import io
+import time
+import logging
+import pytesseract
+from PIL import Image, ImageOps
+from receipt_extractor import extract_receipt_fields
+
+logger = logging.getLogger("dealcost.ocr")
+
+# Preprocessing settings: Tesseract's documentation recommends around 300 DPI, and receipts rarely need
+# more than ~8 inches of height at that density, so larger phone photos are scaled down before OCR.
+# Binarization and cropping are opt-in: their effect on accuracy hasn't been measured on real receipts
+# (see ocr_accuracy.py)
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", 300))
+OCR_MAX_IMAGE_SIDE = int(os.getenv("OCR_MAX_IMAGE_SIDE", 2400))
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "false").lower() == "true"
+OCR_CROP_TEXT_REGION = os.getenv("OCR_CROP_TEXT_REGION", "false").lower() == "true"
+OCR_CROP_MARGIN = 16
+
+# Bump whenever preprocessing or extraction changes so cached results are not reused
+OCR_PIPELINE_VERSION = 2
+
+# Helper to pick a black/white threshold for a grayscale image using Otsu's method
+def otsu_threshold(image):
+    histogram = image.histogram()
+    total = sum(histogram)
+    sum_all = sum(level * count for level, count in enumerate(histogram))
+    sum_background = weight_background = 0
+    best_variance, threshold = 0, 127
+    for level, count in enumerate(histogram):
+        weight_background += count
+        if weight_background == 0:
+            continue
+        weight_foreground = total - weight_background
+        if weight_foreground == 0:
+            break
+        sum_background += level * count
+        mean_background = sum_background / weight_background
+        mean_foreground = (sum_all - sum_background) / weight_foreground
+        variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_variance, threshold = variance, level
+    return threshold
+
+# Prepare an uploaded photo for Tesseract; returns the processed image and per-stage timings in ms
+def preprocess_receipt_image(image):
+    timings = {}
+    stage_start = time.perf_counter()
+
+    def finish_stage(stage):
+        nonlocal stage_start
+        now = time.perf_counter()
+        timings[stage] = round((now - stage_start) * 1000, 1)
+        stage_start = now
+
+    # JPEG can decode straight to a reduced-size grayscale image instead of the full-resolution photo
+    image.draft('L', (OCR_MAX_IMAGE_SIDE, OCR_MAX_IMAGE_SIDE))
+    image = ImageOps.exif_transpose(image)
+    finish_stage("rotate")
+
+    image = image.convert('L')
+    finish_stage("grayscale")
+
+    if max(image.size) > OCR_MAX_IMAGE_SIDE:
+        image.thumbnail((OCR_MAX_IMAGE_SIDE, OCR_MAX_IMAGE_SIDE), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    finish_stage("downscale")
+
+    if OCR_BINARIZE:
+        threshold = otsu_threshold(image)
+        image = image.point([0] * (threshold + 1) + [255] * (255 - threshold))
+        finish_stage("binarize")
+
+        # Crop to the bounding box of the dark (text) pixels; only meaningful on a binarized image
+        if OCR_CROP_TEXT_REGION:
+            box = ImageOps.invert(image).getbbox()
+            if box:
+                left, top, right, bottom = box
+                image = image.crop((
+                    max(0, left - OCR_CROP_MARGIN), max(0, top - OCR_CROP_MARGIN),
+                    min(image.width, right + OCR_CROP_MARGIN), min(image.height, bottom + OCR_CROP_MARGIN)
+                ))
+            finish_stage("crop")
+
+    return image, timings
+
+# Run OCR on an uploaded receipt and extract its fields (top-level so the process pool can pickle it)
+def ocr_receipt(image_bytes, preprocess=True):
+    image = Image.open(io.BytesIO(image_bytes))
+
+    timings = {}
+    if preprocess:
+        image, timings = preprocess_receipt_image(image)
+
+    # Perform OCR on the image
+    ocr_start = time.perf_counter()
+    text = pytesseract.image_to_string(image, config=f"--dpi {OCR_TARGET_DPI}")
+    timings["ocr"] = round((time.perf_counter() - ocr_start) * 1000, 1)
+    logger.debug("OCR timings (ms)", extra={"timings_ms": timings})
+
+    # Extract information from OCR text, keeping only fields that have values
+    result = extract_receipt_fields(text)
+    return {k: v for k, v in result.items() if v is not None}
@@ -0,0 +1,172 @@
+import threading
+import contextvars
+from pymongo import monitoring
+
+# In-process request instrumentation: per-route latency/size histograms, Mongo command counts and time
+# per request (collected by a pymongo CommandListener), OCR durations, rendered in the Prometheus text
+# format by render_prometheus(). Each server process keeps its own numbers; under gunicorn every worker
+# reports separately, distinguished by the pid label app.py adds.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+OCR_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+
+# Most query shapes kept per request for the slow-request log
+MAX_QUERY_SHAPES = 20
+
+# Mongo activity of the request being handled: {"commands", "mongo_seconds", "query_shapes"} (None outside a request)
+request_activity_var = contextvars.ContextVar("request_activity", default=None)
+
+# Helper to escape a Prometheus label value
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+# Helper to render a label set as {name="value",...}
+def format_labels(names, values, extra=()):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name, self.help_text, self.label_names = name, help_text, tuple(label_names)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self, common_labels):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{format_labels(self.label_names + tuple(common_labels), labels + tuple(common_labels.values()))} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label_names=()):
+        self.name, self.help_text, self.label_names = name, help_text, tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value, *labels):
+        with self.lock:
+            series = self.series.setdefault(labels, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self, common_labels):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        names = self.label_names + tuple(common_labels)
+        with self.lock:
+            for labels, series in sorted(self.series.items()):
+                values = labels + tuple(common_labels.values())
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{format_labels(names, values, [('le', bound)])} {count}")
+                lines.append(f"{self.name}_bucket{format_labels(names, values, [('le', '+Inf')])} {series[-1]}")
+                lines.append(f"{self.name}_sum{format_labels(names, values)} {round(series[-2], 6)}")
+                lines.append(f"{self.name}_count{format_labels(names, values)} {series[-1]}")
+        return lines
+
+REQUESTS_TOTAL = Counter("dealcost_requests_total", "HTTP requests by route, method and status", ("route", "method", "status"))
+REQUEST_SECONDS = Histogram("dealcost_request_duration_seconds", "Request latency by route", LATENCY_BUCKETS, ("route", "method"))
+REQUEST_MONGO_COMMANDS = Histogram("dealcost_request_mongo_commands", "MongoDB commands issued per request", COUNT_BUCKETS, ("route", "method"))
+REQUEST_MONGO_SECONDS = Histogram("dealcost_request_mongo_seconds", "Time spent in MongoDB commands per request", LATENCY_BUCKETS, ("route", "method"))
+REQUEST_BYTES = Histogram("dealcost_request_bytes", "Request body size by route", SIZE_BUCKETS, ("route", "method"))
+RESPONSE_BYTES = Histogram("dealcost_response_bytes", "Response body size by route (streamed responses excluded)", SIZE_BUCKETS, ("route", "method"))
+MONGO_COMMANDS_TOTAL = Counter("dealcost_mongo_commands_total", "MongoDB commands by command and outcome", ("command", "outcome"))
+OCR_SECONDS = Histogram("dealcost_ocr_duration_seconds", "Receipt OCR duration (jobs include time queued)", OCR_BUCKETS, ("mode",))
+
+METRICS = [
+    REQUESTS_TOTAL, REQUEST_SECONDS, REQUEST_MONGO_COMMANDS, REQUEST_MONGO_SECONDS,
+    REQUEST_BYTES, RESPONSE_BYTES, MONGO_COMMANDS_TOTAL, OCR_SECONDS
+]
+
+# Helper to reduce a filter/sort document to its shape: field names and operators, never values
+def query_shape(document):
+    if isinstance(document, dict):
+        return {key: query_shape(value) if key.startswith("$") or isinstance(value, dict) else 1
+                for key, value in document.items()}
+    if isinstance(document, list):
+        return [query_shape(item) for item in document[:3]] if any(isinstance(item, dict) for item in document) else 1
+    return 1
+
+# Helper to describe a command as e.g. "find inventory {'username': 1, 'vin': {'$in': 1}}"
+def command_shape(command_name, command):
+    collection = command.get(command_name)
+    if command_name == "aggregate":
+        stages = [next(iter(stage)) for stage in command.get("pipeline", [])]
+        match = next((stage["$match"] for stage in command.get("pipeline", []) if "$match" in stage), None)
+        return f"aggregate {collection} {stages} match={query_shape(match)}"
+    if command_name in ("find", "count", "distinct", "delete", "findAndModify"):
+        return f"{command_name} {collection} {query_shape(command.get('filter', command.get('query', {})))}"
+    if command_name == "update":
+        updates = command.get("updates", [])
+        return f"update {collection} {query_shape(updates[0].get('q', {})) if updates else {}}"
+    return f"{command_name} {collection if isinstance(collection, str) else ''}".strip()
+
+# Times every MongoDB command and charges it to the request that issued it
+class CommandMetricsListener(monitoring.CommandListener):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.shapes = {}  # (connection, request id) -> shape, between started and succeeded/failed
+
+    def started(self, event):
+        if request_activity_var.get() is None:
+            return
+        with self.lock:
+            self.shapes[(event.connection_id, event.request_id)] = command_shape(event.command_name, event.command)
+
+    def finished(self, event, outcome):
+        MONGO_COMMANDS_TOTAL.inc(event.command_name, outcome)
+        with self.lock:
+            shape = self.shapes.pop((event.connection_id, event.request_id), None)
+        activity = request_activity_var.get()
+        if activity is None:
+            return
+        activity["commands"] += 1
+        activity["mongo_seconds"] += event.duration_micros / 1e6
+        if shape and len(activity["query_shapes"]) < MAX_QUERY_SHAPES:
+            activity["query_shapes"].append(f"{shape} {event.duration_micros / 1000:.1f}ms")
+
+    def succeeded(self, event):
+        self.finished(event, "success")
+
+    def failed(self, event):
+        self.finished(event, "failure")
+
+# Start collecting Mongo activity for a new request
+def begin_request():
+    activity = {"commands": 0, "mongo_seconds": 0.0, "query_shapes": []}
+    request_activity_var.set(activity)
+    return activity
+
+# Record one finished request; returns its Mongo activity for the slow-request log
+def record_request(route, method, status, seconds, request_bytes, response_bytes):
+    activity = request_activity_var.get() or {"commands": 0, "mongo_seconds": 0.0, "query_shapes": []}
+    request_activity_var.set(None)
+    REQUESTS_TOTAL.inc(route, method, str(status))
+    REQUEST_SECONDS.observe(seconds, route, method)
+    REQUEST_MONGO_COMMANDS.observe(activity["commands"], route, method)
+    REQUEST_MONGO_SECONDS.observe(activity["mongo_seconds"], route, method)
+    if request_bytes is not None:
+        REQUEST_BYTES.observe(request_bytes, route, method)
+    if response_bytes is not None:
+        RESPONSE_BYTES.observe(response_bytes, route, method)
+    return activity
+
+# Render every metric, plus any extra gauges ({name: (help, value)}), in the Prometheus text format
+def render_prometheus(common_labels, gauges=None):
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render(common_labels))
+    for name, (help_text, value) in (gauges or {}).items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name}{format_labels(tuple(common_labels), tuple(common_labels.values()))} {value}")
+    return "\n".join(lines) + "\n"
@@ -83,6 +83,7 @@ function App() {
     localStorage.removeItem('userToken');
     localStorage.removeItem('username');
     localStorage.removeItem('company_name');
+    localStorage.removeItem('sessionToken');
     setIsAuthenticated(false);
     setCompanyName(''); // Clear company name after logout
     navigate('/login');
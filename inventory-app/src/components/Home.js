@@ -77,7 +77,7 @@ function Home() {
         }
 
         const response = await fetch(
-          `${process.env.REACT_APP_API_URL}/api/dashboard?username=${username}`
+          `${process.env.REACT_APP_API_URL}/api/dashboard?username=${username}&include=inventory,reports`
         );
         const data = await response.json();
         console.log('Raw response:', response);
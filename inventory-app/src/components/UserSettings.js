@@ -148,6 +148,9 @@ function UserSettings({ isDarkMode, onThemeChange }) {
         }
 
         setMessage('Changes were saved successfully!');
+        if (data.token) {
+            localStorage.setItem('sessionToken', data.token);
+        }
         
         if (formData.company_name !== localStorage.getItem('company_name')) {
             localStorage.setItem('company_name', formData.company_name);
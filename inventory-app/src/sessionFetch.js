@@ -0,0 +1,34 @@
+// Attach the session token issued by /api/login to every request sent to the API server,
+// so components can keep calling fetch() directly.
+const originalFetch = window.fetch.bind(window);
+
+// A 401 on a request that carried the token means it expired or is no longer valid: clear the stored
+// login (as logging out does) and send the user back to the login page
+const endSession = () => {
+  localStorage.removeItem('userToken');
+  localStorage.removeItem('username');
+  localStorage.removeItem('company_name');
+  localStorage.removeItem('sessionToken');
+  if (window.location.pathname !== '/login') {
+    window.location.assign('/login');
+  }
+};
+
+window.fetch = (resource, options = {}) => {
+  const url = typeof resource === 'string' ? resource : resource.url;
+  const token = localStorage.getItem('sessionToken');
+
+  if (token && process.env.REACT_APP_API_URL && url.startsWith(process.env.REACT_APP_API_URL)) {
+    const headers = new Headers(options.headers || (typeof resource === 'string' ? undefined : resource.headers));
+    if (!headers.has('Authorization')) {
+      headers.set('Authorization', `Bearer ${token}`);
+    }
+    return originalFetch(resource, { ...options, headers }).then((response) => {
+      if (response.status === 401 && !url.includes('/api/login')) {
+        endSession();
+      }
+      return response;
+    });
+  }
+  return originalFetch(resource, options);
+};